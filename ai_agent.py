@@ -1,18 +1,417 @@
 import requests
+import ast
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import hashlib
+import inspect
+import itertools
 import json
 import re
 import os
 import sys
-from typing import List, Dict, Optional, Callable
+import threading
+import time
+from typing import List, Dict, Optional, Callable, Tuple, Any
+
+from ollama_client import OllamaClient, READ_TIMEOUT
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # tokenizers is optional, token counts fall back to an estimate
+    Tokenizer = None
+
+
+def _approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return len(text) // 4
+
+
+class Message:
+    """
+    Chat message; __slots__ keeps long histories compact compared to dicts
+    
+    Messages are immutable, since their JSON encoding is cached and the
+    history hands out the same objects it sends.
+    """
+    __slots__ = ('role', 'content', 'tokens', '_json')
+    
+    def __init__(self, role: str, content: str, tokens: Optional[int] = None):
+        _set = object.__setattr__
+        _set(self, 'role', role)
+        _set(self, 'content', content)
+        # Size computed once for the history token budget, estimated if not given
+        _set(self, 'tokens', _approx_tokens(content) if tokens is None else tokens)
+        _set(self, '_json', None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Message is immutable, cannot set {name!r}")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"Message is immutable, cannot delete {name!r}")
+    
+    def __reduce__(self):
+        # copy and pickle rebuild through __init__ instead of setting slots
+        return (Message, (self.role, self.content, self.tokens))
+    
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content!r})"
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self.role == other.role and self.content == other.content
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Returns the wire representation of the message"""
+        return {"role": self.role, "content": self.content}
+    
+    def to_json(self) -> bytes:
+        """Returns the message as JSON bytes, encoded once and then reused"""
+        if self._json is None:
+            object.__setattr__(self, '_json', _json_dumps(self))
+        return self._json
+
+
+class _FIFOCache:
+    """Bounded in-memory response cache evicting the oldest entry when full"""
+    __slots__ = ('maxsize', '_entries')
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: Dict[str, str] = {}
+    
+    def get(self, key: str) -> Optional[str]:
+        return self._entries.get(key)
+    
+    def set(self, key: str, value: str):
+        if self.maxsize <= 0:
+            return
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = value
+
+
+def _json_default(obj):
+    """Serializes Message instances for the JSON encoders"""
+    if isinstance(obj, Message):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def _json_dumps(obj) -> bytes:
+        """Serializes obj to compact JSON bytes with sorted keys"""
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_SORT_KEYS)
+    
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj) -> bytes:
+        """Serializes obj to compact JSON bytes with sorted keys"""
+        return json.dumps(obj, default=_json_default, sort_keys=True, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+    
+    # json.loads accepts UTF-8 bytes directly, no explicit decode needed
+    _json_loads = json.loads
+
+# Precompiled patterns for the function call parsing hot path
+_FUNC_CALL_RE = re.compile(r'(\w+)\((.*)\)', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Phrases suggesting the model wrote its final answer without calling reply();
+# one case-insensitive alternation scans the response once for all of them
+_FINAL_ANSWER_INDICATORS = (
+    'respuesta:', 'en resumen', 'por lo tanto', 'finalmente',
+    'en conclusión', 'para concluir', 'respondiendo a tu pregunta',
+    'la respuesta es', 'puedo decirte que', 'según'
+)
+_FINAL_ANSWER_RE = re.compile('|'.join(map(re.escape, _FINAL_ANSWER_INDICATORS)), re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+
+# Streamed output is flushed on newlines or once this many bytes are pending
+_STREAM_FLUSH_BYTES = 256
+
+# Extra exchanges the history may grow by before it is trimmed back to
+# history_limit in one go; between trims the history is append-only, so the
+# prompt prefix stays identical across turns and the server cache keeps hitting
+_HISTORY_TRIM_SLACK = 2
+
+# Tokens kept free in the context window for the model's answer
+_RESPONSE_TOKEN_RESERVE = 512
+
+# Worker threads shared by the tool calls of all turns of one agent
+_TOOL_WORKERS = 8
+
+
+def _json_function_calls(obj: Any) -> List[str]:
+    """
+    Reads the calls of a decoded {"function": "..."} or {"functions": [...]} object
+    
+    Args:
+        obj: Decoded JSON value
+        
+    Returns:
+        List of function call strings, empty if obj is not a call object
+    """
+    if not isinstance(obj, dict):
+        return []
+    if isinstance(obj.get('function'), str):
+        return [obj['function'].strip()]
+    if isinstance(obj.get('functions'), list):
+        return [call.strip() for call in obj['functions'] if isinstance(call, str)]
+    return []
+
+
+@functools.lru_cache(maxsize=256)
+def _format_tool_documentation(func_name: str, docstring: Optional[str]) -> str:
+    """
+    Formats the documentation entry of a tool
+    
+    Cached by name and docstring, so each distinct tool is cleaned only once
+    per process no matter how many agents are created.
+    
+    Args:
+        func_name: Tool function name
+        docstring: Raw tool docstring
+        
+    Returns:
+        Documentation entry for the system prompt
+    """
+    if docstring:
+        # Replace multiple whitespaces and newlines with single spaces
+        docstring = _WHITESPACE_RE.sub(' ', docstring).strip()
+    else:
+        docstring = "Sin descripción disponible"
+    
+    # Add function documentation with clear formatting
+    return "\n".join([
+        f"\n• {func_name}:",
+        f"  Description: {docstring}",
+        f"  Usage: {func_name}(arguments)",
+    ])
+
+
+# Exact shapes of the terminal {"function": "reply(...)"} message the system
+# prompt asks for, matched with plain string operations
+_REPLY_JSON_PREFIXES = ('{"function": "reply(', '{"function":"reply(')
+_REPLY_JSON_SUFFIX = ')"}'
+
+
+def _fast_reply_call(text: str) -> Optional[str]:
+    """
+    Reads the reply call of a bare {"function": "reply('...')"} message
+    
+    Args:
+        text: Stripped model response
+        
+    Returns:
+        The reply(...) call, or None if the text has any other shape (including
+        escapes), so the general parser handles it
+    """
+    if not text.endswith(_REPLY_JSON_SUFFIX) or '\\' in text:
+        return None
+    for prefix in _REPLY_JSON_PREFIXES:
+        if text.startswith(prefix):
+            # A bare quote inside would make the JSON string end early
+            if text.find('"', len(prefix), -len(_REPLY_JSON_SUFFIX)) != -1:
+                return None
+            return text[len(prefix) - len('reply('):-2]
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _build_tools_documentation(tools: Tuple[Tuple[str, Optional[str]], ...]) -> str:
+    """
+    Builds the tools section of the system prompt
+    
+    Cached by the (name, docstring) pairs, so agents with the same tools
+    share the section instead of rebuilding it.
+    
+    Args:
+        tools: (name, docstring) of every tool, sorted by name
+        
+    Returns:
+        Tools documentation
+    """
+    return "\n".join((
+        "\nHERRAMIENTAS DISPONIBLES:",
+        "=" * 40,
+        *(_format_tool_documentation(name, doc) for name, doc in tools),
+        "\nREMEMBER: Only YOU can execute these tools by calling them directly by name.",
+    ))
+
+
+@functools.lru_cache(maxsize=32)
+def _compose_system_prompt(base_prompt: str, tools_documentation: str) -> str:
+    """
+    Joins the base system prompt with the tools documentation
+    
+    Cached and interned, so agents built with the same tools share a single
+    prompt string instead of each concatenating its own copy.
+    
+    Args:
+        base_prompt: Fixed instructions of the agent
+        tools_documentation: Generated tools section, may be empty
+        
+    Returns:
+        Complete system prompt
+    """
+    if tools_documentation:
+        return sys.intern(f"{base_prompt}\n\n{tools_documentation}")
+    return base_prompt
+
+
+def _balanced_call_end(text: str, open_pos: int) -> int:
+    """
+    Finds the end of a call by counting parentheses, ignoring those inside
+    quoted arguments
+    
+    Args:
+        text: Text containing the call
+        open_pos: Position of the call's opening parenthesis
+        
+    Returns:
+        Position just after the closing parenthesis, -1 if it is never closed
+    """
+    paren_count = 0
+    quote = None
+    pos = open_pos
+    
+    while pos < len(text):
+        char = text[pos]
+        if quote:
+            if char == '\\':
+                pos += 1
+            elif char == quote:
+                quote = None
+        elif char == '"' or char == "'":
+            quote = char
+        elif char == '(':
+            paren_count += 1
+        elif char == ')':
+            paren_count -= 1
+            if paren_count == 0:
+                return pos + 1
+        pos += 1
+    return -1
+
+
+def _strip_quotes(text: str) -> str:
+    """Removes one pair of matching surrounding quotes, if present"""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        return text[1:-1]
+    return text
+
+
+@functools.lru_cache(maxsize=256)
+def _split_call(function_call: str) -> Optional[Tuple[str, str]]:
+    """
+    Splits a call string into its function name and raw argument text
+    
+    Args:
+        function_call: String like "function_name(args)"
+        
+    Returns:
+        Tuple of (name, args), None if the string is not a call
+    """
+    match = _FUNC_CALL_RE.match(function_call)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_call_nodes(args_str: str) -> ast.Call:
+    """
+    Parses a call argument string into its syntax tree
+    
+    Cached per argument string, since the model tends to repeat the same
+    calls; the tree is only read, never mutated.
+    
+    Args:
+        args_str: Argument text as written inside the call parentheses
+        
+    Returns:
+        The ast.Call node holding the arguments
+        
+    Raises:
+        SyntaxError: If the arguments are not valid call syntax
+    """
+    return ast.parse(f"_({args_str})", mode='eval').body
+
+
+def _parse_arguments(args_str: str) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """
+    Parses a call argument string into positional and keyword literals
+    
+    Only parsing is cached; the literals are rebuilt on every call, so a
+    tool that mutates its arguments cannot alter later calls.
+    
+    Args:
+        args_str: Argument text as written inside the call parentheses
+        
+    Returns:
+        Tuple of (args, kwargs)
+        
+    Raises:
+        SyntaxError: If the arguments are not valid call syntax
+        ValueError: If an argument is not a Python literal
+    """
+    call = _parse_call_nodes(args_str)
+    
+    args = []
+    for arg in call.args:
+        # *[...] unpacks a literal sequence
+        if isinstance(arg, ast.Starred):
+            args.extend(ast.literal_eval(arg.value))
+        else:
+            args.append(ast.literal_eval(arg))
+    
+    kwargs = {}
+    for kw in call.keywords:
+        # **{...} unpacks a literal dict
+        if kw.arg is None:
+            kwargs.update(ast.literal_eval(kw.value))
+        else:
+            kwargs[kw.arg] = ast.literal_eval(kw.value)
+    
+    return tuple(args), kwargs
+
 
 class AIAgent:
+    # ANSI color codes, resolved once for the class; instances blank them out
+    # when the terminal has no color support
+    GRAY = '\033[90m'
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    
+    # Pre-encoded codes for writing streamed bytes straight to stdout
+    _gray_bytes = GRAY.encode('utf-8')
+    _reset_bytes = RESET.encode('utf-8')
+    
     def __init__(self, 
                  host: str = "127.0.0.1",
                  port: int = 11434,
                  model: str = "gemma3:latest",
                  history_limit: int = 5,
                  tools: Optional[List[Callable]] = None,
-                 max_iterations: int = 10):
+                 max_iterations: int = 10,
+                 context_window: int = 8192,
+                 response_cache_size: int = 128,
+                 history_path: Optional[str] = None,
+                 max_wall_seconds: float = 300,
+                 early_stop: bool = True,
+                 tokenizer: Optional[str] = None,
+                 cache: Optional[Any] = None,
+                 client: Optional[OllamaClient] = None):
         """
         Initialize AI Agent with Ollama integration
         
@@ -20,9 +419,22 @@ class AIAgent:
             host: Ollama server IP (default: 127.0.0.1)
             port: Ollama server port (default: 11434)
             model: Model to use (default: gemma3:latest)
-            history_limit: Maximum number of interactions to maintain (default: 5)
+            history_limit: Interactions kept after each history trim (default: 5)
             tools: List of functions available to the agent (default: None)
             max_iterations: Maximum internal iterations before forcing response (default: 10)
+            context_window: Model context size in tokens, bounds the history sent (default: 8192)
+            response_cache_size: Identical requests whose responses are memoized, 0 disables (default: 128)
+            history_path: NDJSON file where the history is persisted and replayed from (default: None)
+            max_wall_seconds: Time budget for processing one message (default: 300)
+            early_stop: Stop generation once a complete JSON function call has streamed in;
+                disable for models that write JSON examples in their prose (default: True)
+            tokenizer: Hugging Face tokenizer name or tokenizer.json path used to count history
+                tokens; without it (or the tokenizers package) tokens are estimated (default: None)
+            cache: Response cache with get(key) and set(key, value) methods, e.g. a shared or
+                persistent store, used instead of the in-memory one; keys are request hashes
+                as hex strings (default: None)
+            client: Ollama client to send requests through, e.g. one shared by several
+                agents; host and port are ignored when given (default: None)
         """
         self.host = host
         self.port = port
@@ -30,13 +442,42 @@ class AIAgent:
         self.history_limit = history_limit
         self.tools = tools or []
         self.max_iterations = max_iterations
-        self.base_url = f"http://{host}:{port}"
+        self.context_window = context_window
+        self.response_cache_size = response_cache_size
+        self.history_path = history_path
+        self.max_wall_seconds = max_wall_seconds
+        self.early_stop = early_stop
+        self.tokenizer = tokenizer
+        self._count_tokens = self._load_token_counter(tokenizer)
+        
+        # Pooled keep-alive HTTP client; only closed by the agent if it owns it
+        self._owns_client = client is None
+        self._client = client if client is not None else OllamaClient(host, port)
+        self.base_url = self._client.base_url
+        
+        # Responses keyed by a hash of the exact request body
+        self._response_cache = cache if cache is not None else _FIFOCache(response_cache_size)
+        
+        # Response currently being streamed, so a cancelled turn can close it
+        # from the event loop thread
+        self._active_stream: Optional[requests.Response] = None
+        
+        # Tool calls of a response run concurrently on a pool kept for the
+        # agent's lifetime, instead of a fresh executor per message
+        self._tool_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_TOOL_WORKERS, thread_name_prefix="ai-agent-tool"
+        )
         
         # Add built-in reply function
         self._add_reply_function()
         
         # Create tools registry for easy access
         self.tools_registry = {tool.__name__: tool for tool in self.tools}
+        # One alternation over all tool names, so the text is scanned once
+        # per response instead of once per tool
+        self._tool_call_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, self.tools_registry)) + r')\s*\('
+        )
         
         # Generate tools documentation
         self.tools_documentation = self._generate_tools_documentation()
@@ -77,27 +518,45 @@ CASOS ESPECIALES:
 🔴 CRÍTICO: reply() es OBLIGATORIO en cada interacción de finalizacion, con reply indicas tu conclusion"""
         
         # Add tools documentation to system prompt if tools are available
-        if self.tools_documentation:
-            self.system_prompt = f"{base_system_prompt}\n\n{self.tools_documentation}"
-        else:
-            self.system_prompt = base_system_prompt
+        self.system_prompt = _compose_system_prompt(base_system_prompt, self.tools_documentation)
         
-        # Conversation history - always starts with system prompt
-        self.history: List[Dict[str, str]] = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        # Static prefix sent first on every request; built once so it stays
+        # byte-identical and the server can reuse its prefix (KV) cache
+        self._static_prefix = (
+            Message("system", self.system_prompt, self._count_tokens(self.system_prompt)),
+        )
+        self._static_prefix_json = b','.join(m.to_json() for m in self._static_prefix)
+        
+        # Conversation history after the static prefix - trimmed in batches by
+        # _maintain_history_limit; maxlen is only a hard safety cap
+        self._history_window: collections.deque = collections.deque(
+            maxlen=(history_limit + _HISTORY_TRIM_SLACK) * 2
+        )
+        # Approximate token size of the prefix plus the window
+        self._history_token_total = sum(m.tokens for m in self._static_prefix)
+        
+        # Append-only history log, replaying the previous session's last
+        # exchanges; it is compacted to the window after replay and whenever
+        # the window is trimmed, so it never grows past the kept history
+        self._history_log = None
+        if history_path:
+            self._replay_history_log()
+            self._rewrite_history_log()
         
         # Flag to control reply function
         self._reply_called = False
         self._final_response = ""
         
+        # Results of @pure tool calls, reused within the current message
+        self._pure_results: Dict[str, str] = {}
+        
         # Initialize color support
         self._init_color_support()
     
-    def _init_color_support(self):
-        """Initialize color support detection"""
-        self.colors_enabled = False
-        
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _detect_colors() -> bool:
+        """Detects terminal color support once per process"""
         # Check if we're in a terminal that supports colors
         if hasattr(sys.stdout, 'isatty') and sys.stdout.isatty():
             # Check various environment variables that indicate color support
@@ -118,28 +577,35 @@ CASOS ESPECIALES:
                 colorterm or 
                 os.environ.get('FORCE_COLOR') or
                 os.environ.get('CLICOLOR')):
-                self.colors_enabled = True
-        
-        # Set color codes
-        if self.colors_enabled:
-            self.GRAY = '\033[90m'
-            self.RESET = '\033[0m'
-            self.BOLD = '\033[1m'
-            self.GREEN = '\033[92m'
-            self.YELLOW = '\033[93m'
-        else:
-            self.GRAY = ''
-            self.RESET = ''
-            self.BOLD = ''
-            self.GREEN = ''
-            self.YELLOW = ''
+                return True
+        return False
+    
+    def _init_color_support(self):
+        """Initialize color support detection"""
+        self.colors_enabled = self._detect_colors()
+        
+        # The class-level color codes apply as is, only blank them if unsupported
+        if not self.colors_enabled:
+            self.GRAY = self.RESET = self.BOLD = self.GREEN = self.YELLOW = ''
+            self._gray_bytes = self._reset_bytes = b''
     
     def _print_colored(self, text: str, color: str = '', end: str = '', flush: bool = True):
         """Print text with color if supported"""
+        out = sys.stdout
         if color and self.colors_enabled:
-            print(f"{color}{text}{self.RESET}", end=end, flush=flush)
+            out.write(color)
+            out.write(text)
+            out.write(self.RESET)
         else:
-            print(text, end=end, flush=flush)
+            out.write(text)
+        if end:
+            out.write(end)
+        if flush:
+            out.flush()
+    
+    def _flush_output(self):
+        """Flushes pending streamed output (text layer and byte buffer)"""
+        sys.stdout.flush()
     
     def _add_reply_function(self):
         """Adds the built-in reply function"""
@@ -168,31 +634,12 @@ CASOS ESPECIALES:
         if not self.tools:
             return ""
         
-        documentation_lines = ["\nHERRAMIENTAS DISPONIBLES:"]
-        documentation_lines.append("=" * 40)
-        
-        for tool in self.tools:
-            # Get function name
-            func_name = tool.__name__
-            
-            # Get function docstring
-            docstring = tool.__doc__
-            if docstring:
-                # Clean and format docstring
-                docstring = docstring.strip()
-                # Replace multiple whitespaces and newlines with single spaces
-                docstring = ' '.join(docstring.split())
-            else:
-                docstring = "Sin descripción disponible"
-            
-            # Add function documentation with clear formatting
-            documentation_lines.append(f"\n• {func_name}:")
-            documentation_lines.append(f"  Description: {docstring}")
-            documentation_lines.append(f"  Usage: {func_name}(arguments)")
-        
-        documentation_lines.append("\nREMEMBER: Only YOU can execute these tools by calling them directly by name.")
-        
-        return "\n".join(documentation_lines)
+        # inspect.getdoc also finds docstrings of callable objects and
+        # inherited methods, which tool.__doc__ misses. Tools are listed by
+        # name, so the prompt prefix does not depend on registration order
+        return _build_tools_documentation(tuple(sorted(
+            (tool.__name__, inspect.getdoc(tool)) for tool in self.tools
+        )))
     
     def _execute_function(self, function_call: str) -> str:
         """
@@ -209,15 +656,15 @@ CASOS ESPECIALES:
             function_call = function_call.strip()
             
             # Parse function name and arguments
-            match = re.match(r'(\w+)\((.*)\)', function_call)
-            if not match:
+            parsed = _split_call(function_call)
+            if parsed is None:
                 return f"Error: Formato de función inválido: {function_call}. Usa el formato: nombre_funcion(argumentos)"
             
-            func_name = match.group(1)
-            args_str = match.group(2)
+            func_name, args_str = parsed
             
-            # Check if function exists
-            if func_name not in self.tools_registry:
+            # Check if function exists (single registry lookup)
+            func = self.tools_registry.get(func_name)
+            if func is None:
                 available_tools = list(self.tools_registry.keys())
                 return f"Error: Función '{func_name}' no encontrada. Herramientas disponibles: {available_tools}"
             
@@ -225,36 +672,89 @@ CASOS ESPECIALES:
             if func_name == 'reply':
                 self._reply_called = True
                 # Extract the message from the arguments
-                if args_str.startswith("'") and args_str.endswith("'"):
-                    self._final_response = args_str[1:-1]
-                elif args_str.startswith('"') and args_str.endswith('"'):
-                    self._final_response = args_str[1:-1]
-                else:
-                    self._final_response = args_str
+                self._final_response = _strip_quotes(args_str)
                 return f"✓ Respuesta enviada al usuario"
             
-            # Execute the function
-            func = self.tools_registry[func_name]
+            # A pure tool already called this turn with the same arguments
+            is_pure = getattr(func, '__agent_pure__', False)
+            if is_pure:
+                cached = self._pure_results.get(function_call)
+                if cached is not None:
+                    return cached
             
+            # Execute the function
             # Simple argument parsing (handles basic cases)
             if not args_str.strip():
                 result = func()
             else:
-                # Use eval for argument parsing (be careful in production)
-                # This is a simplified approach
+                # Only literal arguments are accepted, nothing gets evaluated
                 try:
-                    result = eval(f"func({args_str})")
+                    args, kwargs = _parse_arguments(args_str)
+                    result = func(*args, **kwargs)
                 except Exception as e:
                     return f"Error en argumentos de {func_name}: {str(e)}. Verifica la sintaxis."
             
-            return str(result)
+            # Coroutine tools run to completion on the calling worker thread
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            
+            # Structured results (lists, dicts) reach the model as compact JSON
+            if isinstance(result, (dict, list, tuple)):
+                try:
+                    result = _json_dumps(result).decode('utf-8')
+                except TypeError:
+                    result = str(result)
+            else:
+                result = str(result)
+            if is_pure:
+                self._pure_results[function_call] = result
+            return result
             
         except Exception as e:
             return f"Error procesando función: {str(e)}"
     
+    def _extract_json_functions(self, text: str) -> List[str]:
+        """
+        Finds the first JSON call object, e.g. {"function": "reply('...')"} or
+        {"functions": ["sumar(1, 2)", "restar(5, 3)"]}
+        
+        Args:
+            text: Text that might contain a JSON function call
+            
+        Returns:
+            List of function call strings, empty if there is none
+        """
+        return self._locate_json_functions(text)[0]
+    
+    def _locate_json_functions(self, text: str) -> Tuple[List[str], int, int]:
+        """
+        Finds the first JSON call object and where it sits in the text
+        
+        Decodes in place from every opening brace, so nested braces in the
+        arguments are handled and the object is parsed a single time.
+        
+        Args:
+            text: Text that might contain a JSON function call
+            
+        Returns:
+            Tuple of (function call strings, start offset, end offset); the
+            list is empty and the span is (0, 0) if there is none
+        """
+        start = text.find('{')
+        while start != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(text, start)
+                calls = _json_function_calls(obj)
+                if calls:
+                    return calls, start, end
+            except json.JSONDecodeError:
+                pass
+            start = text.find('{', start + 1)
+        return [], 0, 0
+    
     def _extract_function_calls(self, text: str) -> List[str]:
         """
-        Extracts all function calls from the text using multiple detection methods
+        Extracts all function calls from the text, as JSON objects or direct calls
         
         Args:
             text: Text that might contain function calls
@@ -265,185 +765,446 @@ CASOS ESPECIALES:
         function_calls = []
         
         try:
-            # Method 1: Look for Python code blocks
-            code_block_pattern = r'```python\s*\n?(.*?)\n?```'
-            code_matches = re.findall(code_block_pattern, text, re.DOTALL | re.IGNORECASE)
-            
-            for match in code_matches:
-                code_content = match.strip()
-                lines = code_content.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if re.match(r'\w+\(.*\)', line):
-                        function_calls.append(line)
-            
-            # Method 2: Look for direct function calls anywhere in text
-            available_functions = list(self.tools_registry.keys())
-            
-            for func_name in available_functions:
-                # Create pattern for this specific function
-                # This pattern looks for: function_name followed by opening parenthesis
-                pattern = rf'\b{re.escape(func_name)}\s*\('
+            # Fast path: the whole reply is a JSON function call, no scanning needed
+            stripped = text.strip()
+            reply_call = _fast_reply_call(stripped)
+            if reply_call is not None:
+                return [reply_call]
+            if stripped.startswith('{') and stripped.endswith('}'):
+                try:
+                    calls = _json_function_calls(_json_loads(stripped))
+                    if calls:
+                        return calls
+                except json.JSONDecodeError:
+                    pass
+            
+            # Method 0: Look for a JSON object like {"function": "name(args)"}
+            json_calls, json_start, json_end = self._locate_json_functions(text)
+            function_calls.extend(json_calls)
+            
+            # Method 1: One left-to-right pass over calls to known tools, in
+            # plain text and code blocks alike. Matches inside an already found
+            # call (e.g. a tool named in a reply() message) or inside the JSON
+            # object, where quotes are still escaped, are skipped
+            covered_end = 0
+            for match in self._tool_call_re.finditer(text):
+                start_pos = match.start()
+                if start_pos < covered_end:
+                    continue
+                if json_start <= start_pos < json_end:
+                    covered_end = json_end
+                    continue
                 
-                # Find all matches of this pattern
-                matches = re.finditer(pattern, text)
+                end_pos = _balanced_call_end(text, match.end() - 1)
+                if end_pos == -1:
+                    # Unbalanced (e.g. an apostrophe in unquoted text): take
+                    # the rest of the line up to its last parenthesis
+                    line_end = text.find('\n', start_pos)
+                    if line_end == -1:
+                        line_end = len(text)
+                    end_pos = text.rfind(')', start_pos, line_end) + 1
+                    if end_pos <= match.end():
+                        continue
                 
-                for match in matches:
-                    start_pos = match.start()
-                    # Find the complete function call by counting parentheses
-                    paren_count = 0
-                    pos = match.end() - 1  # Start from the opening parenthesis
-                    
-                    while pos < len(text):
-                        if text[pos] == '(':
-                            paren_count += 1
-                        elif text[pos] == ')':
-                            paren_count -= 1
-                            if paren_count == 0:
-                                # Found the complete function call
-                                function_call = text[start_pos:pos+1]
-                                function_calls.append(function_call)
-                                break
-                        pos += 1
-            
-            # Method 3: Look for function calls on their own lines
-            lines = text.split('\n')
-            for line in lines:
-                line = line.strip()
-                # Check if line looks like a function call
-                if re.match(r'\w+\(.*\)', line):
-                    func_name = line.split('(')[0]
-                    if func_name in self.tools_registry:
-                        function_calls.append(line)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_calls = []
-            for call in function_calls:
-                if call not in seen:
-                    seen.add(call)
-                    unique_calls.append(call)
-            
-            return unique_calls
+                function_calls.append(text[start_pos:end_pos])
+                covered_end = end_pos
+            
+            # The same call can also be written out in the text next to the JSON
+            return list(dict.fromkeys(function_calls))
             
         except Exception as e:
             print(f"Error extracting function calls: {e}")
             return []
     
-    def _get_agent_response(self, messages: List[Dict[str, str]]) -> str:
+    def _encode_history(self) -> bytes:
+        """
+        Serializes the conversation history once, reusing the frozen static prefix
+        
+        Returns:
+            Comma separated JSON messages, without the enclosing brackets
+        """
+        parts = [self._static_prefix_json]
+        # Each message is encoded once, when it is first sent, not every turn
+        parts.extend(m.to_json() for m in self._history_window)
+        return b','.join(parts)
+    
+    def _encode_payload(self, history_json: bytes, tail: List[Message]) -> bytes:
+        """
+        Builds the chat payload splicing the pre-serialized history with the turn tail
+        
+        Args:
+            history_json: Serialized history from _encode_history
+            tail: Messages produced during the current turn
+            
+        Returns:
+            UTF-8 encoded JSON body
+        """
+        # One join copies the (large) history bytes once, a chain of + would
+        # copy them again for every operand after it
+        # num_ctx makes the server use the window the history is trimmed to;
+        # otherwise it keeps its own, possibly smaller, one and silently drops
+        # the start of the prompt
+        parts = [
+            b'{"model":', _json_dumps(self.model),
+            b',"stream":true,"options":{"num_ctx":%d},"messages":[' % self.context_window,
+            history_json,
+        ]
+        for message in tail:
+            parts.append(b',')
+            parts.append(message.to_json())
+        parts.append(b']}')
+        return b''.join(parts)
+    
+    def _get_agent_response(self, history_json: bytes, tail: List[Message],
+                            deadline: Optional[float] = None,
+                            cancel: Optional[threading.Event] = None) -> str:
         """
         Gets response from the agent with streaming
         
         Args:
-            messages: Message history
+            history_json: Serialized history from _encode_history
+            tail: Messages produced during the current turn (append-only)
+            deadline: time.monotonic() value at which the stream is cut off;
+                the read timeout is also shrunk to fit it
+            cancel: Event that stops reading the stream once set; it is also
+                set when the deadline cuts the stream off
             
         Returns:
-            Complete agent response
+            Complete agent response, partial if cancelled or cut off
         """
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": True
-        }
+        body = self._encode_payload(history_json, tail)
+        
+        # Identical request already answered - skip the round-trip
+        cache_key = hashlib.blake2b(body, digest_size=16).hexdigest()
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._print_colored(cached, self.GRAY, end="", flush=True)
+            return cached
+        
+        read_timeout = READ_TIMEOUT
+        if deadline is not None:
+            read_timeout = max(0.5, min(read_timeout, deadline - time.monotonic()))
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                stream=True,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            complete_response = ""
-            
-            # Process response stream with color
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        chunk = json.loads(line.decode('utf-8'))
-                        if 'message' in chunk and 'content' in chunk['message']:
-                            content = chunk['message']['content']
-                            self._print_colored(content, self.GRAY, end="", flush=True)
-                            complete_response += content
-                            
-                        # Check if stream is done
-                        if chunk.get('done', False):
+            # The slot on the client is held until the stream is closed
+            with self._client.stream_chat(body, read_timeout=read_timeout) as response:
+                self._active_stream = response
+                # Accumulate raw UTF-8 and decode once at the end
+                buf = bytearray()
+                
+                # Write chunks as bytes, skipping the text layer encoder; fall back
+                # to the text layer when stdout has no byte buffer
+                out = getattr(sys.stdout, 'buffer', None)
+                pending = 0
+                # The color is switched on once before the first chunk and off
+                # once at the end, not around every chunk
+                colored = False
+                stopped = False
+                
+                try:
+                    # Process response stream with color
+                    for line in response.iter_lines(chunk_size=8192):
+                        if cancel is not None and cancel.is_set():
+                            break
+                        # A model that keeps streaming never hits the read
+                        # timeout, so the wall-clock budget is checked here too
+                        if deadline is not None and time.monotonic() >= deadline:
+                            stopped = True
+                            if cancel is not None:
+                                cancel.set()
                             break
+                        if line:
+                            # The final chunk carries only stats, no need to parse it
+                            if b'"done":true' in line:
+                                break
                             
-                    except json.JSONDecodeError:
-                        continue
-            
+                            try:
+                                chunk = _json_loads(line)
+                                if 'message' in chunk and 'content' in chunk['message']:
+                                    content = chunk['message']['content']
+                                    piece = content.encode('utf-8')
+                                    buf.extend(piece)
+                                    if out is not None:
+                                        if not colored:
+                                            out.write(self._gray_bytes)
+                                        pending += out.write(piece)
+                                    else:
+                                        if not colored:
+                                            sys.stdout.write(self.GRAY)
+                                        sys.stdout.write(content)
+                                        pending += len(piece)
+                                    colored = True
+                                    
+                                    # Coalesce small writes, one flush per line or batch
+                                    if b'\n' in piece or pending >= _STREAM_FLUSH_BYTES:
+                                        self._flush_output()
+                                        pending = 0
+                                    
+                                    # A complete JSON function call ends the turn, stop
+                                    # generation instead of waiting for the rest
+                                    if (self.early_stop and '}' in content
+                                            and self._extract_json_functions(buf.decode('utf-8'))):
+                                        response.close()
+                                        break
+                                    
+                                # Check if stream is done
+                                if chunk.get('done', False):
+                                    break
+                                    
+                            except json.JSONDecodeError:
+                                continue
+                finally:
+                    self._active_stream = None
+                    # Restore the terminal color even if the stream failed midway
+                    if colored:
+                        if out is not None:
+                            out.write(self._reset_bytes)
+                        else:
+                            sys.stdout.write(self.RESET)
+                        self._flush_output()
+                
+            complete_response = buf.decode('utf-8')
+            # Errors, empty and cancelled generations are never cached
+            if complete_response and not stopped and not (cancel is not None and cancel.is_set()):
+                self._response_cache.set(cache_key, complete_response)
             return complete_response
             
         except Exception as e:
             return f"Error: {str(e)}"
     
+    @property
+    def history(self) -> List[Message]:
+        """Snapshot of the conversation history, starting with the system prompt"""
+        return list(itertools.chain(self._static_prefix, self._history_window))
+    
+    def _load_token_counter(self, tokenizer: Optional[str]) -> Callable[[str], int]:
+        """
+        Builds the function used to size history messages
+        
+        Args:
+            tokenizer: Tokenizer name or path, or None
+            
+        Returns:
+            Exact token counter if the tokenizer loads, the estimate otherwise
+        """
+        if tokenizer and Tokenizer is not None:
+            try:
+                if os.path.exists(tokenizer):
+                    tok = Tokenizer.from_file(tokenizer)
+                else:
+                    tok = Tokenizer.from_pretrained(tokenizer)
+                return lambda text: len(tok.encode(text, add_special_tokens=False).ids)
+            except Exception as e:
+                print(f"Tokenizer no disponible ({e}), se usará una estimación de tokens")
+        return _approx_tokens
+    
+    def _append_history(self, role: str, content: str, log: bool = True):
+        """Appends a message to the history tracking its token size"""
+        message = Message(role, content, self._count_tokens(content))
+        window = self._history_window
+        if window and len(window) == window.maxlen:
+            # The deque is about to evict its oldest message
+            self._history_token_total -= window[0].tokens
+        window.append(message)
+        if window:
+            self._history_token_total += message.tokens
+        
+        if log and self._history_log is not None:
+            self._history_log.write(message.to_json() + b'\n')
+            self._history_log.flush()
+    
+    def _replay_history_log(self):
+        """Loads the last exchanges stored in the history log, if any"""
+        if not os.path.exists(self.history_path):
+            return
+        
+        # Only the trailing lines can survive the history limit
+        with open(self.history_path, 'rb') as log_file:
+            lines = collections.deque(log_file, maxlen=self.history_limit * 2)
+        
+        for line in lines:
+            try:
+                message = _json_loads(line)
+                self._append_history(message["role"], message["content"], log=False)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+        
+        self._maintain_history_limit()
+    
     def _maintain_history_limit(self):
-        """Maintains history within the specified limit"""
-        # Always preserve the system message (first message)
-        if len(self.history) > (self.history_limit * 2 + 1):
-            # Keep system message, and the last N exchanges
-            messages_to_keep = self.history_limit * 2
-            self.history = self.history[:1] + self.history[-(messages_to_keep):]
+        """Maintains history within the exchange limit and the context token budget"""
+        window = self._history_window
+        
+        size_before = len(window)
+        
+        # Trim back to the last N exchanges only once the slack is used up, so
+        # most turns leave the already cached prompt prefix untouched
+        if len(window) >= window.maxlen:
+            while len(window) > self.history_limit * 2:
+                self._history_token_total -= window.popleft().tokens
+        
+        # Drop whole old exchanges while over the token budget, always keeping
+        # the last one
+        budget = self.context_window - _RESPONSE_TOKEN_RESERVE
+        while self._history_token_total > budget and len(window) > 2:
+            self._history_token_total -= window.popleft().tokens + window.popleft().tokens
+        
+        if len(window) < size_before and self._history_log is not None:
+            self._rewrite_history_log()
+    
+    def _rewrite_history_log(self):
+        """Replaces the history log with the messages in the window and reopens it for appending"""
+        tmp_path = self.history_path + '.tmp'
+        with open(tmp_path, 'wb') as tmp_file:
+            tmp_file.writelines(m.to_json() + b'\n' for m in self._history_window)
+        # Closed first, an open file cannot be replaced on Windows
+        if self._history_log is not None:
+            self._history_log.close()
+        os.replace(tmp_path, self.history_path)
+        self._history_log = open(self.history_path, 'ab')
+    
+    def _fit_to_budget(self, text: str, used_tokens: int) -> str:
+        """
+        Truncates text so the prompt stays within the context token budget
+        
+        Args:
+            text: Message about to be added to the turn
+            used_tokens: Tokens already taken by the history and the turn
+            
+        Returns:
+            The text, cut short with a marker if it does not fit
+        """
+        available = self.context_window - _RESPONSE_TOKEN_RESERVE - used_tokens
+        if self._count_tokens(text) <= available:
+            return text
+        # ~4 characters per token, the same ratio as the estimate
+        return text[:max(available, 0) * 4] + "\n... [resultado truncado]"
+    
+    def _split_reply_call(self, function_calls: List[str]) -> Tuple[List[str], Optional[str], str]:
+        """
+        Splits the calls of one response at the first reply() call
+        
+        Args:
+            function_calls: Calls in the order they were found
+            
+        Returns:
+            Tuple of (calls before reply, reply call or None, raw reply
+            arguments); calls after reply are dropped since reply ends the turn
+        """
+        for index, call in enumerate(function_calls):
+            call = call.strip()
+            if call.startswith('reply(') and call.endswith(')'):
+                return function_calls[:index], call, call[len('reply('):-1]
+            match = _FUNC_CALL_RE.match(call)
+            if match and match.group(1) == 'reply':
+                return function_calls[:index], call, match.group(2)
+        return function_calls, None, ""
+    
+    def send_message(self, message: str) -> str:
+        """
+        Send a message to the agent and receive response after internal iterations
+        
+        Blocking wrapper around send_message_async; from code that already
+        runs an event loop await send_message_async instead.
+        """
+        return asyncio.run(self.send_message_async(message))
     
     # Mejoras sugeridas para el método send_message
 
-    def send_message(self, message: str) -> str:
+    async def send_message_async(self, message: str) -> str:
         """
         Send a message to the agent and receive response after internal iterations
+        
+        The Ollama request runs in a worker thread and independent tool calls
+        of one response run concurrently, so several agents can share an
+        event loop. Each agent handles one message at a time; use separate
+        instances for concurrent conversations.
         """
         # Reset reply state
         self._reply_called = False
         self._final_response = ""
+        self._pure_results.clear()
         
-        # Add user message to history
-        self.history.append({"role": "user", "content": message})
-        
-        # Internal iteration loop
-        current_messages = self.history.copy()
+        # Internal iteration loop - the turn's messages, starting with the user
+        # message, are only ever appended after the history so the prefix sent
+        # to the server stays stable. History itself is committed once the
+        # turn completes, so an aborted turn leaves nothing to roll back
+        turn_messages: List[Message] = [Message("user", message)]
+        # History does not change during the turn, serialize it only once
+        history_json = self._encode_history()
         iteration = 0
         consecutive_no_reply = 0  # Contador para respuestas sin reply()
+        deadline = time.monotonic() + self.max_wall_seconds
+        timed_out = False
         
         print(f"Usuario: {message}")
         print("--- Procesamiento interno del agente ---")
         
         while not self._reply_called and iteration < self.max_iterations:
+            if time.monotonic() >= deadline:
+                timed_out = True
+                break
+            
             iteration += 1
             self._print_colored(f"\n[Iteración {iteration}]", self.YELLOW)
             
             # Get agent response
             self._print_colored(" Agente piensa: ", self.GRAY, end="", flush=True)
-            agent_response = self._get_agent_response(current_messages)
+            cancel = threading.Event()
+            try:
+                agent_response = await asyncio.to_thread(
+                    self._get_agent_response, history_json, turn_messages, deadline, cancel
+                )
+            except asyncio.CancelledError:
+                # The worker thread cannot be cancelled and the event loop waits
+                # for it on shutdown, so stop its stream (Ctrl+C ends up here)
+                cancel.set()
+                stream = self._active_stream
+                if stream is not None:
+                    self._client.abort(stream)
+                raise
             print()  # New line after streaming
             
+            # The deadline cut the response off mid-stream, so it is incomplete
+            if cancel.is_set():
+                timed_out = True
+                break
+            
             # Check if there are function calls in the response
             function_calls = self._extract_function_calls(agent_response)
             
             if function_calls:
                 consecutive_no_reply = 0  # Reset counter si hay function calls
                 
-                # Execute all found function calls
-                for function_call in function_calls:
+                # Calls before reply() are independent, execute them concurrently
+                tool_calls, reply_call, reply_args = self._split_reply_call(function_calls)
+                loop = asyncio.get_running_loop()
+                tool_results = await asyncio.gather(*(
+                    loop.run_in_executor(self._tool_executor, self._execute_function, call)
+                    for call in tool_calls
+                ))
+                for function_call, function_result in zip(tool_calls, tool_results):
                     self._print_colored(f"⚡ Ejecutando: {function_call}", self.GREEN)
-                    
-                    # Execute the function
-                    function_result = self._execute_function(function_call)
                     self._print_colored(f"📋 Resultado: {function_result}", self.GREEN)
-                    
-                    # If reply was called, break out of both loops
-                    if self._reply_called:
-                        break
+                
+                # reply() ends the turn, so it runs last; it only hands its
+                # argument back, so skip the registry and argument parsing
+                if reply_call is not None:
+                    self._print_colored(f"⚡ Ejecutando: {reply_call}", self.GREEN)
+                    self._reply_called = True
+                    self._final_response = _strip_quotes(reply_args)
+                    self._print_colored("📋 Resultado: ✓ Respuesta enviada al usuario", self.GREEN)
                 
                 # Add to conversation (only if not reply)
                 if not self._reply_called:
-                    current_messages.append({"role": "assistant", "content": agent_response})
+                    turn_messages.append(Message("assistant", agent_response))
                     # Combine all results into one message
-                    results_message = "Resultados de la ejecución de funciones:\n" + "\n".join([
-                        f"- {call}: {self._execute_function(call)}" 
-                        for call in function_calls
-                    ])
-                    current_messages.append({"role": "user", "content": results_message})
+                    results_message = "Resultados de la ejecución de funciones:\n" + "\n".join(
+                        f"- {call}: {result}" for call, result in zip(tool_calls, tool_results)
+                    )
+                    used_tokens = self._history_token_total + sum(m.tokens for m in turn_messages)
+                    results_message = self._fit_to_budget(results_message, used_tokens)
+                    turn_messages.append(Message("user", results_message))
                     
             else:
                 consecutive_no_reply += 1
@@ -451,47 +1212,46 @@ CASOS ESPECIALES:
                 # NUEVA LÓGICA: Detectar si necesita usar reply() y forzarlo
                 if consecutive_no_reply >= 2:
                     # Después de 2 respuestas sin function calls, forzar reply()
-                    current_messages.append({"role": "assistant", "content": agent_response})
-                    current_messages.append({
-                        "role": "user", 
-                        "content": """🚨 CRÍTICO: DEBES usar la función reply() AHORA. 
+                    turn_messages.append(Message("assistant", agent_response))
+                    turn_messages.append(Message(
+                        "user",
+                        """🚨 CRÍTICO: DEBES usar la función reply() AHORA. 
                         
                         No puedes continuar sin usar reply(). El sistema requiere que uses:
                         reply('tu respuesta completa en español aquí')
                         
                         Esto es OBLIGATORIO para terminar la conversación correctamente."""
-                    })
+                    ))
                     consecutive_no_reply = 0
                     continue
                 
                 # Check if the response looks like it's trying to be a final answer
-                final_answer_indicators = [
-                    'respuesta:', 'en resumen', 'por lo tanto', 'finalmente', 
-                    'en conclusión', 'para concluir', 'respondiendo a tu pregunta',
-                    'la respuesta es', 'puedo decirte que', 'según'
-                ]
-                
-                if any(phrase in agent_response.lower() for phrase in final_answer_indicators):
+                if _FINAL_ANSWER_RE.search(agent_response):
                     # Looks like a final answer - force reply()
-                    current_messages.append({"role": "assistant", "content": agent_response})
-                    current_messages.append({
-                        "role": "user", 
-                        "content": """Parece que tienes una respuesta lista. DEBES usar la función reply() para enviarla:
+                    turn_messages.append(Message("assistant", agent_response))
+                    turn_messages.append(Message(
+                        "user",
+                        """Parece que tienes una respuesta lista. DEBES usar la función reply() para enviarla:
                         
                         reply('tu respuesta completa aquí')
                         
                         Es OBLIGATORIO usar reply() para terminar la conversación."""
-                    })
+                    ))
                 else:
                     # If it doesn't look like a final answer, encourage progress
-                    current_messages.append({"role": "assistant", "content": agent_response})
-                    current_messages.append({
-                        "role": "user", 
-                        "content": "Continúa con tu análisis y usa las herramientas apropiadas, o si ya tienes la respuesta, usa reply() para enviarla."
-                    })
+                    turn_messages.append(Message("assistant", agent_response))
+                    turn_messages.append(Message(
+                        "user",
+                        "Continúa con tu análisis y usa las herramientas apropiadas, o si ya tienes la respuesta, usa reply() para enviarla."
+                    ))
+        
+        # Handle time budget exhausted
+        if timed_out and not self._reply_called:
+            self._final_response = "Lo siento, se agotó el tiempo de procesamiento. Por favor, reformula tu consulta."
+            self._print_colored("⚠️ Tiempo límite alcanzado - forzando respuesta", self.YELLOW)
         
         # Handle max iterations reached
-        if iteration >= self.max_iterations and not self._reply_called:
+        elif iteration >= self.max_iterations and not self._reply_called:
             self._final_response = "Lo siento, se alcanzó el límite máximo de procesamiento. Por favor, reformula tu consulta."
             self._print_colored("⚠️ Límite de iteraciones alcanzado - forzando respuesta", self.YELLOW)
         
@@ -499,22 +1259,48 @@ CASOS ESPECIALES:
         print(f"✅ Respuesta final: {self._final_response}")
         
         # Add final exchange to history
-        self.history.append({"role": "assistant", "content": self._final_response})
+        self._append_history("user", message)
+        self._append_history("assistant", self._final_response)
         
         # Maintain history limit
         self._maintain_history_limit()
         
         return self._final_response
 
-    def get_history(self) -> List[Dict[str, str]]:
-        """Returns the current conversation history"""
-        return self.history.copy()
+    def get_history(self) -> Tuple[Dict[str, str], ...]:
+        """Returns an immutable view of the current conversation history"""
+        return tuple(m.to_dict() for m in itertools.chain(self._static_prefix, self._history_window))
     
     def clear_history(self):
         """Resets history keeping only the system prompt"""
-        self.history = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        self._history_window.clear()
+        self._history_token_total = sum(m.tokens for m in self._static_prefix)
+        if self._history_log is not None:
+            self._history_log.truncate(0)
+    
+    def warmup(self) -> bool:
+        """
+        Primes Ollama with the current history so the first real message
+        reuses the server-side prompt cache
+        
+        The model is pinned in memory (keep_alive=-1) and only one token is
+        generated. num_ctx matches the chat requests, since a different
+        value makes Ollama reload the model.
+        
+        Returns:
+            True if the server accepted the request
+        """
+        body = b''.join([
+            b'{"model":', _json_dumps(self.model),
+            b',"stream":false,"keep_alive":-1,"options":{"num_ctx":%d,"num_predict":1},"messages":['
+            % self.context_window,
+            self._encode_history(), b']}',
+        ])
+        try:
+            self._client.chat(body)
+            return True
+        except requests.RequestException:
+            return False
     
     def change_model(self, new_model: str):
         """Changes the AI model to use"""
@@ -529,7 +1315,13 @@ CASOS ESPECIALES:
             "model": self.model,
             "history_limit": self.history_limit,
             "max_iterations": self.max_iterations,
-            "messages_in_history": len(self.history),
+            "max_wall_seconds": self.max_wall_seconds,
+            "early_stop": self.early_stop,
+            "tokenizer": self.tokenizer,
+            "context_window": self.context_window,
+            "response_cache_size": self.response_cache_size,
+            "history_path": self.history_path,
+            "messages_in_history": len(self._static_prefix) + len(self._history_window),
             "base_url": self.base_url,
             "tools_count": len(self.tools),
             "tools_documentation": self.tools_documentation
@@ -537,4 +1329,13 @@ CASOS ESPECIALES:
     
     def get_tools_documentation(self) -> str:
         """Returns the tools documentation string"""
-        return self.tools_documentation
\ No newline at end of file
+        return self.tools_documentation
+    
+    def close(self):
+        """Closes the HTTP client (if owned), the tool workers and the history log"""
+        if self._owns_client:
+            self._client.close()
+        self._tool_executor.shutdown(wait=False)
+        if self._history_log is not None:
+            self._history_log.close()
+            self._history_log = None
\ No newline at end of file
@@ -1,45 +1,80 @@
-import tools
+from tools import (
+    buscar_en_internet,
+    obtener_contenido_url,
+    calcular,
+    obtener_fecha_hora_actual,
+    calcular_distancia_en_anios,
+)
+from tools.web import precalentar_conexiones
 from ai_agent import AIAgent
+import atexit
 import os
+import sys
+
+# Clear the screen with an ANSI escape instead of spawning the clear command;
+# older Windows consoles don't process ANSI sequences
+if os.name == 'nt':
+    os.system('cls')
+elif sys.stdout.isatty():
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
 
-os.system("clear")
+# Open the search API connection in the background while the user types
+precalentar_conexiones()
 
 # Create agent instance
+# AIAgent.send_message_async lets several agents share one event loop; for
+# their requests to actually run in parallel start Ollama with
+# OLLAMA_NUM_PARALLEL > 1, otherwise the server queues them. When set here as
+# well, OllamaClient caps its requests in flight to the same number
 agent = AIAgent(
     model='gemma3:latest',
     history_limit=30, 
     tools=[
-        tools.buscar_en_internet, 
-        tools.obtener_contenido_url, 
-        tools.sumar, 
-        tools.restar, 
-        tools.multiplicar, 
-        tools.dividir, 
-        tools.potencia, 
-        tools.modulo, 
-        tools.obtener_fecha_hora_actual, 
-        tools.calcular_distancia_en_anios
+        buscar_en_internet, 
+        obtener_contenido_url, 
+        calcular, 
+        obtener_fecha_hora_actual, 
+        calcular_distancia_en_anios
     ]
 )
 
+# Release the pooled HTTP connections and the history log on exit
+atexit.register(agent.close)
 
 print(agent.get_info()['model'])
 
 
+def _do_exit(agent):
+    print("Goodbye!")
+    return False
+
+
+def _do_clear(agent):
+    agent.clear_history()
+    print("History cleared.")
+    return True
+
+
+# REPL commands; each returns whether the loop keeps running
+_COMMANDS = {
+    'exit': _do_exit,
+    'clear': _do_clear,
+}
+
+
 while True:
     try:
         # Get user input
         user_message = input("\nYou: ").strip()
+        if not user_message:
+            continue
         
-        if user_message.lower() == 'exit':
-            print("Goodbye!")
+        command = _COMMANDS.get(user_message.lower())
+        if command is not None:
+            if command(agent):
+                continue
             break
-        elif user_message.lower() == 'clear':
-            agent.clear_history()
-            print("History cleared.")
-            continue
-        elif not user_message:
-            continue
         
         # Send message and receive response
         agent.send_message(user_message)
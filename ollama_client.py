@@ -0,0 +1,180 @@
+import requests
+from requests.adapters import HTTPAdapter
+import contextlib
+import os
+import socket
+import threading
+from typing import Iterator, Optional
+
+# HTTP timeouts in seconds. Connecting is bounded just above a multiple of
+# the 3 s TCP retransmission window; the read timeout is the longest silence
+# allowed between streamed chunks, which must cover loading a cold model
+# before the first token
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 60
+
+# Keep-alive pool: one pool per host, sized so that concurrent requests
+# reuse warm connections instead of opening new ones
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 40
+
+
+class OllamaClient:
+    """
+    Pooled keep-alive HTTP client for the Ollama chat API
+    
+    Agents only build the request bodies; connection reuse, headers and
+    timeouts live here, so a single client can be shared by several agents.
+    
+    /api/chat takes one conversation per request, so concurrent requests
+    cannot be merged into one call. Instead, requests beyond the server's
+    parallel slots wait on the client rather than piling up in the server
+    queue while holding open connections.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 11434,
+                 max_parallel: Optional[int] = None):
+        """
+        Initialize the client
+        
+        Args:
+            host: Ollama server IP (default: 127.0.0.1)
+            port: Ollama server port (default: 11434)
+            max_parallel: Requests in flight at once, matching the server's
+                OLLAMA_NUM_PARALLEL; read from that variable when not given,
+                unlimited if neither is set (default: None)
+        """
+        self.host = host
+        self.port = port
+        self.base_url = f"http://{host}:{port}"
+        self._chat_url = f"{self.base_url}/api/chat"
+        
+        if max_parallel is None and os.environ.get("OLLAMA_NUM_PARALLEL", "").isdigit():
+            max_parallel = int(os.environ["OLLAMA_NUM_PARALLEL"]) or None
+        self.max_parallel = max_parallel
+        self._slots = threading.BoundedSemaphore(max_parallel) if max_parallel else None
+        
+        # Persistent HTTP session so every request reuses the keep-alive connection
+        self._session = requests.Session()
+        # No transparent retries: a failed generation is reported back to the caller
+        adapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE, max_retries=0
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate",
+            "Content-Type": "application/json",
+        })
+    
+    @contextlib.contextmanager
+    def _slot(self, timeout: float) -> Iterator[None]:
+        """
+        Holds one of the parallel request slots, if limited
+        
+        Args:
+            timeout: Longest wait for a free slot in seconds
+        
+        Raises:
+            requests.Timeout: If no slot frees up in time
+        """
+        if self._slots is None:
+            yield
+            return
+        if not self._slots.acquire(timeout=timeout):
+            raise requests.Timeout(
+                f"No free Ollama request slot after {timeout:.1f} s "
+                f"({self.max_parallel} in flight)"
+            )
+        try:
+            yield
+        finally:
+            self._slots.release()
+    
+    def chat(self, body: bytes, read_timeout: float = READ_TIMEOUT) -> requests.Response:
+        """
+        Posts a pre-serialized /api/chat request and reads the whole response
+        
+        Args:
+            body: UTF-8 encoded JSON request body
+            read_timeout: Longest wait for data from the server in seconds
+        
+        Returns:
+            The response, already checked for an error status
+        
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        with self._slot(read_timeout):
+            return self._post(body, False, read_timeout)
+    
+    @contextlib.contextmanager
+    def stream_chat(self, body: bytes,
+                    read_timeout: float = READ_TIMEOUT) -> Iterator[requests.Response]:
+        """
+        Posts a pre-serialized /api/chat request for a streamed response
+        
+        The request slot is held and the response kept open until the
+        with block exits. Waiting for a free slot is bounded by read_timeout
+        as well, so a deadline the caller fits it to also covers the queue.
+        
+        Args:
+            body: UTF-8 encoded JSON request body
+            read_timeout: Longest wait between streamed chunks in seconds
+        
+        Yields:
+            The response, already checked for an error status
+        
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        with self._slot(read_timeout):
+            response = self._post(body, True, read_timeout)
+            try:
+                yield response
+            finally:
+                response.close()
+    
+    def _post(self, body: bytes, stream: bool, read_timeout: float) -> requests.Response:
+        """Sends the request through the pooled session"""
+        response = self._session.post(
+            self._chat_url,
+            data=body,
+            # Body is serialized up-front, so the size is known and it is
+            # never sent with chunked framing
+            headers={"Content-Length": str(len(body))},
+            stream=stream,
+            timeout=(CONNECT_TIMEOUT, read_timeout)
+        )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # A streamed response holds its pooled connection until closed
+            response.close()
+            raise
+        return response
+    
+    @staticmethod
+    def abort(response: requests.Response):
+        """
+        Closes a streamed response from another thread
+        
+        The socket is shut down first, since closing it alone does not wake
+        a thread blocked reading from it.
+        
+        Args:
+            response: Response returned by stream_chat
+        """
+        connection = getattr(response.raw, "connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        response.close()
+    
+    def close(self):
+        """Closes the pooled connections"""
+        self._session.close()
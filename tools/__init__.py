@@ -0,0 +1,17 @@
+from tools.web import obtener_contenido_url, buscar_en_internet
+from tools.arithmetic import sumar, restar, multiplicar, dividir, potencia, modulo, calcular
+from tools.time_utils import obtener_fecha_hora_actual, calcular_distancia_en_anios
+
+__all__ = [
+    "obtener_contenido_url",
+    "buscar_en_internet",
+    "sumar",
+    "restar",
+    "multiplicar",
+    "dividir",
+    "potencia",
+    "modulo",
+    "calcular",
+    "obtener_fecha_hora_actual",
+    "calcular_distancia_en_anios",
+]
@@ -0,0 +1,177 @@
+from operator import add as _add, sub as _sub, mul as _mul, pow as _pow, truediv as _truediv, mod as _mod
+from tools.markers import pure
+
+
+@pure
+def sumar(a: float, b: float) -> float:
+    """
+    Suma dos números.
+
+    Args:
+        a (float): El primer número.
+        b (float): El segundo número.
+
+    Returns:
+        float: La suma de a y b.
+
+    Ejemplo:
+        >>> sumar(3, 5)
+        8
+    """
+    return a + b
+
+
+@pure
+def restar(a: float, b: float) -> float:
+    """
+    Resta el segundo número al primero.
+
+    Args:
+        a (float): El primer número.
+        b (float): El segundo número.
+
+    Returns:
+        float: El resultado de a - b.
+
+    Ejemplo:
+        >>> restar(10, 4)
+        6
+    """
+    return a - b
+
+
+@pure
+def multiplicar(a: float, b: float) -> float:
+    """
+    Multiplica dos números.
+
+    Args:
+        a (float): El primer número.
+        b (float): El segundo número.
+
+    Returns:
+        float: El producto de a y b.
+
+    Ejemplo:
+        >>> multiplicar(2, 3)
+        6
+    """
+    return a * b
+
+
+@pure
+def dividir(a: float, b: float) -> float:
+    """
+    Divide el primer número entre el segundo.
+
+    Args:
+        a (float): El dividendo.
+        b (float): El divisor (debe ser distinto de cero).
+
+    Returns:
+        float: El resultado de a / b.
+
+    Raises:
+        ValueError: Si b es cero.
+
+    Ejemplo:
+        >>> dividir(10, 2)
+        5.0
+    """
+    # La división en C ya detecta el cero; solo se traduce la excepción
+    try:
+        return _truediv(a, b)
+    except ZeroDivisionError:
+        raise ValueError("No se puede dividir entre cero.") from None
+
+
+@pure
+def potencia(a: float, b: float) -> float:
+    """
+    Eleva el primer número a la potencia del segundo.
+
+    Args:
+        a (float): La base.
+        b (float): El exponente.
+
+    Returns:
+        float: El resultado de a elevado a la b.
+
+    Ejemplo:
+        >>> potencia(2, 3)
+        8
+    """
+    return a ** b
+
+
+@pure
+def modulo(a: float, b: float) -> float:
+    """
+    Calcula el residuo de la división del primer número entre el segundo.
+
+    Args:
+        a (float): El dividendo.
+        b (float): El divisor.
+
+    Returns:
+        float: El residuo de a dividido por b.
+
+    Raises:
+        ValueError: Si b es cero.
+
+    Ejemplo:
+        >>> modulo(10, 3)
+        1
+    """
+    try:
+        return _mod(a, b)
+    except ZeroDivisionError:
+        raise ValueError("No se puede calcular el módulo con divisor cero.") from None
+
+
+# Operaciones de calcular, resueltas directamente por las funciones en C del
+# módulo operator
+_OPERACIONES = {
+    "+": _add,
+    "-": _sub,
+    "*": _mul,
+    "/": _truediv,
+    "**": _pow,
+    "%": _mod,
+}
+
+_ERRORES_CERO = {
+    "/": "No se puede dividir entre cero.",
+    "%": "No se puede calcular el módulo con divisor cero.",
+    "**": "No se puede elevar cero a una potencia negativa.",
+}
+
+
+@pure
+def calcular(operacion: str, a: float, b: float) -> float:
+    """
+    Aplica una operación aritmética a dos números.
+
+    Args:
+        operacion (str): Operación a realizar: "+" (suma), "-" (resta), "*" (multiplicación),
+            "/" (división), "**" (potencia) o "%" (módulo).
+        a (float): El primer número.
+        b (float): El segundo número.
+
+    Returns:
+        float: El resultado de aplicar la operación a a y b.
+
+    Raises:
+        ValueError: Si la operación no existe o b es cero en una división o módulo.
+
+    Ejemplo:
+        >>> calcular("*", 2, 3)
+        6
+    """
+    funcion = _OPERACIONES.get(operacion)
+    if funcion is None:
+        raise ValueError(f"Operación no válida: {operacion!r}. Usa una de: {', '.join(_OPERACIONES)}.")
+    try:
+        return funcion(a, b)
+    except ZeroDivisionError:
+        raise ValueError(_ERRORES_CERO[operacion]) from None
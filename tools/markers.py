@@ -0,0 +1,13 @@
+def pure(func):
+    """
+    Marca una herramienta como pura: mismos argumentos, mismo resultado y sin efectos secundarios.
+    El agente reutiliza su resultado si se repite la misma llamada dentro de un mensaje.
+
+    Args:
+        func (callable): Función de la herramienta.
+
+    Returns:
+        callable: La misma función, marcada.
+    """
+    func.__agent_pure__ = True
+    return func
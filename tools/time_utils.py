@@ -0,0 +1,60 @@
+from datetime import datetime
+from functools import lru_cache
+from time import time as _time
+
+# Resueltos una sola vez: cada llamada sigue buscando el nombre global, pero se
+# ahorra la búsqueda del atributo. No se pasan como argumentos por defecto para
+# no añadir parámetros internos a la firma pública de las herramientas
+_ahora = datetime.now
+
+# Los husos horarios se desplazan en múltiplos de 15 minutos, así que la
+# medianoche local siempre cae en el borde de uno de estos intervalos
+_INTERVALO_ANIO = 900
+
+
+@lru_cache(maxsize=1)
+def _anio_actual(intervalo: int) -> int:
+    """
+    Devuelve el año actual, calculado una sola vez por intervalo.
+
+    Args:
+        intervalo (int): Número de intervalo de 15 minutos; al cambiar, se recalcula el año.
+
+    Returns:
+        int: Año actual.
+    """
+    return _ahora().year
+
+
+def obtener_fecha_hora_actual() -> str:
+    """
+    Obtiene la fecha y hora actual del sistema en formato ISO 8601.
+
+    Returns:
+        str: Fecha y hora actual (ej. '2025-06-21T05:30:00').
+    """
+    return _ahora().isoformat()
+
+
+def calcular_distancia_en_anios(anio: int) -> int:
+    """
+    Calcula la diferencia en años entre el año actual y un año dado.
+
+    Args:
+        anio (int): Año con el que se quiere comparar (por ejemplo, 1990).
+
+    Returns:
+        int: Diferencia en años. Positivo si es pasado, negativo si es futuro, 0 si es el mismo año.
+
+    Raises:
+        ValueError: Si el año proporcionado es negativo.
+    
+    Ejemplo:
+        >>> calcular_distancia_en_anios(2000)
+        25  # si el año actual es 2025
+    """
+    if anio < 0:
+        raise ValueError("El año no puede ser negativo.")
+    
+    anio_actual = _anio_actual(int(_time() // _INTERVALO_ANIO))
+    return anio_actual - anio
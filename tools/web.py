@@ -0,0 +1,415 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from itertools import repeat
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Union
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson es opcional, se usa la biblioteca estándar
+    from json import loads as _json_loads
+
+# Cargar variables de entorno desde el archivo .env
+load_dotenv()
+API_KEY = os.getenv("BRAVE_SEARCH_API_KEY")
+
+# Petición a Brave Search, construida una sola vez. La compresión ya la pide
+# requests por defecto en cada sesión (Accept-Encoding: gzip, deflate), y el
+# token va solo en estas cabeceras y no en las de la sesión, para no enviarlo
+# a las páginas de los resultados
+_BRAVE_URL = "https://api.search.brave.com/res/v1/web/search"
+_BRAVE_HEADERS = {
+    "Accept": "application/json",
+    "X-Subscription-Token": API_KEY
+}
+
+# Sesión HTTP compartida: reutiliza las conexiones keep-alive (y el handshake
+# TLS) entre llamadas a Brave y a las páginas de resultados
+_SESSION = requests.Session()
+# Las páginas de resultados no se reintentan: cada fallo cuenta una sola vez
+# para el control de hosts caídos y cuesta un solo timeout
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+# Solo la consulta a Brave se reintenta ante fallos pasajeros (requests usa
+# el prefijo más largo que coincida con la URL)
+_SESSION.mount(
+    "https://api.search.brave.com/",
+    HTTPAdapter(max_retries=Retry(total=2, backoff_factor=0.2, allowed_methods=["GET"])),
+)
+atexit.register(_SESSION.close)
+
+# Hilos para descargar en paralelo las páginas de los resultados de búsqueda
+_FETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tools-fetch")
+atexit.register(_FETCH_POOL.shutdown, wait=False)
+
+# Caché en memoria con caducidad (TTL) y expulsión LRU: el agente suele
+# repetir la misma búsqueda o URL dentro de una conversación
+_SEARCH_TTL = 300
+_URL_TTL = 600
+_CACHE_MAX_ENTRIES = 256
+_SEARCH_CACHE = OrderedDict()
+_URL_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+# Hosts que no responden: tras varios fallos de conexión seguidos se dejan de
+# intentar durante un tiempo, en lugar de esperar el timeout en cada resultado
+_FALLOS_MAX = 3
+_ESPERA_HOST = 300
+_HOSTS_MAX = 512
+_FALLOS_HOST = OrderedDict()
+
+# Búsquedas en curso, para que las peticiones simultáneas de la misma
+# búsqueda compartan una sola consulta a Brave
+_BUSQUEDAS_EN_CURSO = {}
+
+# Caracteres de texto de cada página que se incluyen en los resultados de
+# búsqueda, y máximo de HTML que se lee para encontrarlos
+_SNIPPET_CHARS = 1000
+_PAGINA_MAX_CHARS = 200_000
+
+
+def _cache_get(cache: OrderedDict, key, ttl: float):
+    """
+    Devuelve el valor guardado si sigue vigente, o None.
+
+    Args:
+        cache (OrderedDict): Caché a consultar.
+        key: Clave buscada.
+        ttl (float): Segundos que un valor sigue vigente.
+
+    Returns:
+        El valor guardado o None si no existe o caducó.
+    """
+    with _CACHE_LOCK:
+        entrada = cache.get(key)
+        if entrada is None:
+            return None
+        guardado, valor = entrada
+        if time.monotonic() - guardado >= ttl:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return valor
+
+
+def _cache_set(cache: OrderedDict, key, valor) -> None:
+    """
+    Guarda un valor expulsando el menos usado si la caché está llena.
+
+    Args:
+        cache (OrderedDict): Caché donde guardar.
+        key: Clave del valor.
+        valor: Valor a guardar.
+    """
+    with _CACHE_LOCK:
+        cache[key] = (time.monotonic(), valor)
+        cache.move_to_end(key)
+        while len(cache) > _CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+def _host_caido(host: str) -> bool:
+    """
+    Indica si el host acumula demasiados fallos recientes para volver a intentarlo.
+
+    Args:
+        host (str): Host de la URL.
+
+    Returns:
+        bool: True si hay que evitar el host por ahora.
+    """
+    with _CACHE_LOCK:
+        fallos, ultimo = _FALLOS_HOST.get(host, (0, 0.0))
+    return fallos >= _FALLOS_MAX and time.monotonic() - ultimo < _ESPERA_HOST
+
+def _anotar_fallo(host: str) -> None:
+    """Suma un fallo de conexión al host."""
+    with _CACHE_LOCK:
+        fallos, _ = _FALLOS_HOST.get(host, (0, 0.0))
+        _FALLOS_HOST[host] = (fallos + 1, time.monotonic())
+        _FALLOS_HOST.move_to_end(host)
+        while len(_FALLOS_HOST) > _HOSTS_MAX:
+            _FALLOS_HOST.popitem(last=False)
+
+def _anotar_respuesta(host: str) -> None:
+    """Olvida los fallos del host, que ha vuelto a responder."""
+    with _CACHE_LOCK:
+        _FALLOS_HOST.pop(host, None)
+
+@contextlib.contextmanager
+def _abrir_pagina(url: str) -> Iterator[requests.Response]:
+    """
+    Abre una respuesta en streaming para la URL y la cierra al salir del bloque,
+    devolviendo la conexión al pool aunque quede cuerpo sin leer.
+
+    Args:
+        url (str): Dirección URL a consultar.
+
+    Yields:
+        requests.Response: Respuesta ya comprobada, con codificación de texto definida.
+
+    Raises:
+        requests.RequestException: Si la petición falla o el host está marcado como caído.
+    """
+    try:
+        host = urlsplit(url).netloc
+    except ValueError as e:
+        # Una URL mal formada es un error de la petición como cualquier otro
+        raise requests.exceptions.InvalidURL(f"URL no válida: {url} ({e})") from None
+    if _host_caido(host):
+        raise requests.ConnectionError(f"{host} no ha respondido en los últimos intentos")
+
+    try:
+        respuesta = _SESSION.get(url, timeout=10, stream=True)
+    except (requests.ConnectionError, requests.Timeout):
+        _anotar_fallo(host)
+        raise
+    _anotar_respuesta(host)
+
+    try:
+        respuesta.raise_for_status()
+        # Sin charset declarado, requests supone ISO-8859-1 para text/* (o nada,
+        # y iter_content devolvería bytes); hoy casi todas las páginas son UTF-8
+        if "charset" not in respuesta.headers.get("Content-Type", "").lower():
+            respuesta.encoding = "utf-8"
+        yield respuesta
+    finally:
+        respuesta.close()
+
+def _abrir_conexion_brave() -> None:
+    """
+    Abre la conexión TLS con Brave Search y la deja en el pool de la sesión.
+    Los errores se ignoran: la primera búsqueda simplemente pagará el handshake.
+    """
+    try:
+        _SESSION.head("https://api.search.brave.com/", timeout=5).close()
+    except requests.RequestException:
+        pass
+
+def precalentar_conexiones():
+    """
+    Abre en segundo plano las conexiones que usarán las herramientas, para que
+    la primera búsqueda no espere al handshake TCP/TLS delante del usuario.
+
+    Returns:
+        Future o None: Tarea en curso, o None si no hay clave API configurada.
+    """
+    if not API_KEY:
+        return None
+    return _FETCH_POOL.submit(_abrir_conexion_brave)
+
+def obtener_contenido_url(url: str, max_chars: int = 4000) -> str:
+    """
+    Descarga la página de la URL dada y devuelve su texto visible, sin etiquetas HTML,
+    scripts ni estilos. La descarga se detiene en cuanto se han reunido max_chars caracteres.
+
+    Args:
+        url (str): Dirección URL a consultar.
+        max_chars (int): Número máximo de caracteres de texto a devolver (por defecto 4000).
+
+    Returns:
+        str: Texto de la página o mensaje de error.
+    """
+    return _texto_de_pagina(url, max_chars)
+
+class _ExtractorTexto(HTMLParser):
+    """
+    Acumula el texto visible de un HTML que se le pasa por partes,
+    ignorando scripts, estilos y demás contenido que no se muestra.
+    """
+
+    _OCULTAS = frozenset({"script", "style", "noscript", "template", "svg", "title"})
+    # Etiquetas de bloque: separan palabras aunque no haya espacios en el HTML
+    _BLOQUES = frozenset({
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+        "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+        "nav", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+    })
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.partes = []
+        self.leidos = 0
+        self._ocultas = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._OCULTAS:
+            self._ocultas += 1
+        elif tag in self._BLOQUES:
+            self.partes.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self._OCULTAS:
+            if self._ocultas:
+                self._ocultas -= 1
+        elif tag in self._BLOQUES:
+            self.partes.append(" ")
+
+    def handle_data(self, data):
+        # El texto se guarda tal cual: el parser lo corta donde acaba cada
+        # trozo recibido, y una palabra puede quedar repartida entre dos
+        if self._ocultas:
+            return
+        self.partes.append(data)
+        # Solo cuenta caracteres que no son espacios: nunca supera la longitud
+        # del texto final, así que completo no se activa antes de tiempo
+        self.leidos += len(data) - sum(map(str.isspace, data))
+
+    @property
+    def completo(self) -> bool:
+        """Indica si ya se reunió todo el texto necesario."""
+        return self.leidos >= self.max_chars
+
+    def texto(self) -> str:
+        """Devuelve el texto reunido con los espacios normalizados, recortado a max_chars."""
+        return " ".join("".join(self.partes).split())[:self.max_chars].rstrip()
+
+def _texto_de_pagina(url: str, max_chars: int) -> str:
+    """
+    Descarga una página y devuelve los primeros max_chars caracteres de su texto visible.
+    El HTML se analiza a medida que llega y la descarga se detiene en cuanto hay suficiente texto.
+
+    Args:
+        url (str): Dirección URL a consultar.
+        max_chars (int): Número máximo de caracteres de texto a devolver.
+
+    Returns:
+        str: Texto de la página o mensaje de error.
+    """
+    clave = (url, max_chars)
+    contenido = _cache_get(_URL_CACHE, clave, _URL_TTL)
+    if contenido is not None:
+        return contenido
+
+    try:
+        with _abrir_pagina(url) as respuesta:
+            extractor = _ExtractorTexto(max_chars)
+            leidos = 0
+            for trozo in respuesta.iter_content(chunk_size=2048, decode_unicode=True):
+                extractor.feed(trozo)
+                leidos += len(trozo)
+                if extractor.completo or leidos >= _PAGINA_MAX_CHARS:
+                    break
+            else:
+                # Página completa: se procesa lo que quede pendiente. Tras un
+                # corte se omite, porque lo pendiente es marcado a medias
+                extractor.close()
+            contenido = extractor.texto()
+        _cache_set(_URL_CACHE, clave, contenido)
+        return contenido
+    except requests.RequestException as e:
+        return f"Error al acceder a la URL: {e}"
+
+def buscar_en_internet(query: str, limite: int = 3) -> Union[List[dict], str]:
+    """
+    Consulta Brave Search API y devuelve los primeros resultados con título, URL,
+    descripción y los primeros 1000 caracteres del texto de cada página encontrada.
+    No sobrepasar el limite de 3 resultados.
+
+    Args:
+        query (str): Texto a buscar.
+        limite (int): Número máximo de resultados a mostrar (por defecto 3).
+
+    Returns:
+        list[dict] | str: Resultados en orden, cada uno con las claves titulo, url,
+            descripcion y contenido, o mensaje de error.
+    """
+    if not API_KEY:
+        return "No se encontró la clave API. Verifica tu archivo .env."
+
+    clave = (query, limite)
+    cacheado = _cache_get(_SEARCH_CACHE, clave, _SEARCH_TTL)
+    if cacheado is not None:
+        return _copiar_resultados(cacheado)
+
+    # Si la misma búsqueda ya está en curso en otro hilo, se espera su
+    # resultado en lugar de repetir la petición
+    with _CACHE_LOCK:
+        en_curso = _BUSQUEDAS_EN_CURSO.get(clave)
+        if en_curso is None:
+            en_curso = _BUSQUEDAS_EN_CURSO[clave] = Future()
+            propia = True
+        else:
+            propia = False
+    if not propia:
+        return _copiar_resultados(en_curso.result())
+
+    try:
+        resultado = _consultar_brave(query, limite)
+        en_curso.set_result(resultado)
+        return _copiar_resultados(resultado)
+    except BaseException as e:
+        en_curso.set_exception(e)
+        raise
+    finally:
+        with _CACHE_LOCK:
+            del _BUSQUEDAS_EN_CURSO[clave]
+
+def _copiar_resultados(resultado: Union[tuple, str]) -> Union[List[dict], str]:
+    """
+    Copia los resultados compartidos (caché y búsquedas en curso) antes de
+    entregarlos, para que quien los modifique no altere los de los demás.
+
+    Args:
+        resultado (tuple | str): Resultados guardados o mensaje de error.
+
+    Returns:
+        list[dict] | str: Copia de los resultados o el mismo mensaje.
+    """
+    if isinstance(resultado, str):
+        return resultado
+    return [dict(item) for item in resultado]
+
+def _consultar_brave(query: str, limite: int) -> Union[tuple, str]:
+    """
+    Realiza la búsqueda en Brave Search API y descarga las páginas de los resultados.
+
+    Args:
+        query (str): Texto a buscar.
+        limite (int): Número máximo de resultados a mostrar.
+
+    Returns:
+        tuple | str: Resultados (tupla de dicts, compartida; no modificar) o mensaje de error.
+    """
+    clave = (query, limite)
+    try:
+        response = _SESSION.get(_BRAVE_URL, headers=_BRAVE_HEADERS, params={"q": query}, timeout=10)
+        response.raise_for_status()
+        # Se decodifican directamente los bytes, sin pasar por response.text
+        resultados = _json_loads(response.content)
+        items = resultados.get("web", {}).get("results", [])[:limite]
+
+        if not items:
+            return "No se encontraron resultados."
+
+        # Las páginas se descargan a la vez: el tiempo total es el de la más
+        # lenta y no la suma de todas. Los errores llegan como texto, así que
+        # un fallo no interrumpe el resto
+        urls = [item.get("url", "Sin URL") for item in items]
+        contenidos = _FETCH_POOL.map(_texto_de_pagina, urls, repeat(_SNIPPET_CHARS))
+
+        resultado = tuple(
+            {
+                "titulo": item.get("title", "Sin título"),
+                "url": url_res,
+                "descripcion": item.get("description", "Sin descripción"),
+                "contenido": contenido,
+            }
+            for item, url_res, contenido in zip(items, urls, contenidos)
+        )
+        _cache_set(_SEARCH_CACHE, clave, resultado)
+        return resultado
+
+    except (requests.RequestException, ValueError) as e:
+        return f"Error en la búsqueda: {e}"